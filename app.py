@@ -1,10 +1,10 @@
 import os
-import csv
-import json
-import collections
 from datetime import datetime, timezone
 
-from flask import Flask, jsonify, Response, send_from_directory
+import orjson
+from flask import Flask, Response, send_file, send_from_directory
+
+from standings import standings_from_csv
 
 # -----------------------------------------------------------------------------
 # Configuração básica
@@ -24,43 +24,33 @@ CSV_CANDIDATES = [
 # JSON estático com jogos (criado pelo getGames.py via GitHub Actions)
 GAMES_JSON_PATH = os.path.join(BASE_DIR, "data", "games_cache.json")
 
-# Conferência por equipa (tricode)
-CONF_BY_TRICODE = {
-    "BOS": "East", "BUF": "East", "DET": "East", "FLA": "East", "MTL": "East",
-    "OTT": "East", "TBL": "East", "TOR": "East", "CAR": "East", "CBJ": "East",
-    "NJD": "East", "NYI": "East", "NYR": "East", "PHI": "East", "PIT": "East",
-    "WSH": "East", "ARI": "West", "CGY": "West", "CHI": "West", "COL": "West",
-    "DAL": "West", "EDM": "West", "LAK": "West", "MIN": "West", "NSH": "West",
-    "SJS": "West", "SEA": "West", "STL": "West", "VAN": "West", "VGK": "West",
-    "WPG": "West", "ANA": "West",
-}
+# JSON estático com standings pré-calculadas (criado pelo getQuarters.py)
+STANDINGS_JSON_PATH = os.path.join(BASE_DIR, "data", "standings_cache.json")
+
+# Cache em memória das standings, invalidada pelo mtime do CSV
+_STANDINGS_CACHE = {"mtime": None, "payload": None, "body": None}
+
+# Bytes dos JSON estáticos, invalidados pelo mtime do ficheiro
+_GAMES_CACHE = {"mtime": None, "body": None}
+_STANDINGS_JSON_CACHE = {"mtime": None, "body": None}
 
 # -----------------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------------
 
-def safe_int(value, default=None):
-    try:
-        if value is None:
-            return default
-        return int(value)
-    except (ValueError, TypeError):
-        return default
-
-
-def compute_streak(results):
-    """Recebe lista de 'W'/'L' e devolve '+N' ou '-N'."""
-    if not results:
-        return ""
-    last = results[-1]
-    count = 0
-    for r in reversed(results):
-        if r == last:
-            count += 1
-        else:
-            break
-    sign = "+" if last == "W" else "-"
-    return f"{sign}{count}"
+def _json(obj, status=200):
+    """Resposta JSON serializada com orjson (mais rápido que jsonify)."""
+    return Response(orjson.dumps(obj), status=status, mimetype="application/json")
+
+
+def _read_cached_bytes(path, cache):
+    """Lê o ficheiro só quando o mtime muda; devolve os bytes em cache."""
+    mtime = os.stat(path).st_mtime_ns
+    if cache["mtime"] != mtime:
+        with open(path, "rb") as f:
+            body = f.read()
+        cache.update(mtime=mtime, body=body)
+    return cache["body"]
 
 
 # -----------------------------------------------------------------------------
@@ -94,144 +84,21 @@ def compute_standings_from_csv():
         return rows_final, warnings
 
     try:
-        games = collections.defaultdict(list)
-        with open(csv_path, encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                gid = row.get("GAME_ID")
-                if not gid:
-                    continue
-                games[gid].append(row)
-
-        team_stats = {}
-
-        def get_stats(team_id, tricode, name):
-            s = team_stats.get(team_id)
-            if not s:
-                conf = CONF_BY_TRICODE.get(tricode, "")
-                s = {
-                    "team_id": safe_int(team_id),
-                    "tricode": tricode,
-                    "team": name,
-                    "city": "",
-                    "name": name,
-                    "conf": conf,
-                    "wins": 0,
-                    "losses": 0,
-                    "home_w": 0,
-                    "home_l": 0,
-                    "away_w": 0,
-                    "away_l": 0,
-                    "results": [],
-                    "home_results": [],
-                    "away_results": [],
-                }
-                team_stats[team_id] = s
-            return s
-
-        for gid, team_rows in games.items():
-            if len(team_rows) != 2:
-                continue
-
-            a, b = team_rows
-            matchup = a.get("MATCHUP") or b.get("MATCHUP") or ""
-            parts = matchup.split()
-            if "@" in parts:
-                away_code = parts[0]
-                home_code = parts[-1]
-            else:
-                if len(parts) >= 3:
-                    home_code = parts[0]
-                    away_code = parts[-1]
-                else:
-                    home_code = a.get("TEAM_ABBREVIATION")
-                    away_code = b.get("TEAM_ABBREVIATION")
-
-            rows_by_code = {row.get("TEAM_ABBREVIATION"): row for row in team_rows}
-            home_row = rows_by_code.get(home_code) or a
-            away_row = rows_by_code.get(away_code) or b
-
-            try:
-                home_pts = int(home_row.get("GOALS") or 0)
-                away_pts = int(away_row.get("GOALS") or 0)
-            except ValueError:
-                continue
-
-            if home_pts > away_pts:
-                home_result, away_result = "W", "L"
-            elif home_pts < away_pts:
-                home_result, away_result = "L", "W"
-            else:
-                continue
-
-            for row, is_home, result in [
-                (home_row, True, home_result),
-                (away_row, False, away_result),
-            ]:
-                tid = row.get("TEAM_ID")
-                tri = row.get("TEAM_ABBREVIATION")
-                name = row.get("TEAM_NAME")
-                if not tid or not tri:
-                    continue
-
-                s = get_stats(tid, tri, name)
-
-                if result == "W":
-                    s["wins"] += 1
-                    if is_home:
-                        s["home_w"] += 1
-                    else:
-                        s["away_w"] += 1
-                else:
-                    s["losses"] += 1
-                    if is_home:
-                        s["home_l"] += 1
-                    else:
-                        s["away_l"] += 1
-
-                s["results"].append(result)
-                if is_home:
-                    s["home_results"].append(result)
-                else:
-                    s["away_results"].append(result)
-
-        for team_id, s in team_stats.items():
-            wins = s["wins"]
-            losses = s["losses"]
-            games_played = wins + losses
-            win_pct = wins / games_played if games_played else 0.0
-
-            row = {
-                "team_id": s["team_id"],
-                "tricode": s["tricode"],
-                "team": s["team"],
-                "city": s["city"],
-                "name": s["name"],
-                "conf": s["conf"],
-                "wins": wins,
-                "losses": losses,
-                "win_pct": win_pct,
-                "home_w": s["home_w"],
-                "home_l": s["home_l"],
-                "road_w": s["away_w"],
-                "road_l": s["away_l"],
-                "streak": compute_streak(s["results"]),
-                "streak_home": compute_streak(s["home_results"]),
-                "streak_away": compute_streak(s["away_results"]),
-                "league_rank": None,
-                "playoff_rank": None,
-            }
-            rows_final.append(row)
-
-        rows_final.sort(
-            key=lambda r: (-r["win_pct"], -r["wins"], (r["team"] or ""))
-        )
+        mtime = os.stat(csv_path).st_mtime_ns
+    except OSError as exc:
+        warnings.append(f"Erro ao ler CSV de standings: {exc}")
+        return rows_final, warnings
 
-    except Exception as exc:  # noqa: BLE001
-        warnings.append(f"Erro ao processar CSV de standings: {exc}")
-        rows_final = []
+    if _STANDINGS_CACHE["mtime"] == mtime:
+        return _STANDINGS_CACHE["payload"]
+
+    rows_final, warnings = standings_from_csv(csv_path)
+    if warnings:
+        return rows_final, warnings
 
-    return rows_final, warnings
+    payload = (rows_final, warnings)
+    _STANDINGS_CACHE.update(mtime=mtime, payload=payload, body=None)
+    return payload
 
 
 # -----------------------------------------------------------------------------
@@ -240,7 +107,8 @@ def compute_standings_from_csv():
 
 @app.route("/")
 def index():
-    return send_from_directory(BASE_DIR, "index.html")
+    # ETag + max-age: o browser revalida e recebe 304 se não mudou
+    return send_from_directory(BASE_DIR, "index.html", conditional=True, max_age=60)
 
 
 @app.route("/api/quarters_csv")
@@ -248,56 +116,77 @@ def quarters_csv():
     csv_path, selection_warnings = select_csv_path()
 
     if selection_warnings:
-        return jsonify({"error": selection_warnings[0]}), 500
+        return _json({"error": selection_warnings[0]}, 500)
 
     try:
-        with open(csv_path, "r", encoding="utf-8") as f:
-            csv_text = f.read()
-        return Response(csv_text, mimetype="text/csv")
+        # send_file faz streaming do ficheiro (sendfile quando o servidor suporta)
+        return send_file(
+            csv_path,
+            mimetype="text/csv",
+            conditional=True,
+            etag=True,
+            last_modified=os.path.getmtime(csv_path),
+            max_age=60,
+        )
     except Exception as exc:  # noqa: BLE001
-        return jsonify({"error": f"Falha ao ler CSV: {exc}"}), 500
+        return _json({"error": f"Falha ao ler CSV: {exc}"}, 500)
 
 @app.route("/api/games")
 def api_games():
     if not os.path.exists(GAMES_JSON_PATH):
-        return jsonify({
+        return _json({
             "ok": False,
             "live_games": [],
             "today_upcoming": [],
             "tomorrow_upcoming": [],
             "warnings": ["games_cache.json não encontrado"],
-            "generated_at_utc": datetime.now(timezone.utc).isoformat()
+            "generated_at_utc": datetime.now(timezone.utc),
         })
 
     try:
-        with open(GAMES_JSON_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return jsonify(data)
+        body = _read_cached_bytes(GAMES_JSON_PATH, _GAMES_CACHE)
+        return Response(body, mimetype="application/json")
     except Exception as e:
-        return jsonify({
+        return _json({
             "ok": False,
             "live_games": [],
             "today_upcoming": [],
             "tomorrow_upcoming": [],
             "warnings": [str(e)],
-            "generated_at_utc": datetime.now(timezone.utc).isoformat()
+            "generated_at_utc": datetime.now(timezone.utc),
         })
 
 
 @app.route("/api/standings")
 def api_standings():
-    rows, warnings = compute_standings_from_csv()
-    ok = bool(rows)
-    return jsonify({"ok": ok, "rows": rows, "warnings": warnings})
+    # standings pré-calculadas pelo getQuarters.py; se faltarem, calcula do CSV
+    if os.path.exists(STANDINGS_JSON_PATH):
+        try:
+            body = _read_cached_bytes(STANDINGS_JSON_PATH, _STANDINGS_JSON_CACHE)
+            return Response(body, mimetype="application/json")
+        except OSError:
+            pass
+
+    payload = compute_standings_from_csv()
+    rows, warnings = payload
+    body = {"ok": bool(rows), "rows": rows, "warnings": warnings}
+
+    # payload em cache -> reutiliza o JSON já serializado
+    if payload is _STANDINGS_CACHE["payload"]:
+        if _STANDINGS_CACHE["body"] is None:
+            _STANDINGS_CACHE["body"] = orjson.dumps(body)
+        return Response(_STANDINGS_CACHE["body"], mimetype="application/json")
+
+    return _json(body)
 
 
 @app.route("/api/health")
 def api_health():
-    return jsonify(
+    return _json(
         {
             "ok": True,
             "message": "NHL backend a funcionar",
-            "time_utc": datetime.now(timezone.utc).isoformat(),
+            "time_utc": datetime.now(timezone.utc),
         }
     )
 
@@ -7,16 +7,29 @@ e grava em data/games_cache.json com o mesmo contrato que o frontend ja usa.
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Tuple
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_FILE = os.path.join(BASE_DIR, "data", "games_cache.json")
 
 SCHEDULE_URL = "https://api-web.nhle.com/v1/schedule/{date}"
 BOX_URL = "https://api-web.nhle.com/v1/gamecenter/{game_id}/boxscore"
+MAX_WORKERS = 16
+
+# sessao partilhada (keep-alive) para api-web.nhle.com: um unico host,
+# pool com uma ligacao por thread
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS, max_retries=0),
+)
+SESSION.headers.update({"Accept": "application/json", "User-Agent": "nhl-dashboard/1.0"})
 
 
 def safe_int(value):
@@ -26,15 +39,15 @@ def safe_int(value):
         return None
 
 
+_STATE_MAP = {
+    **dict.fromkeys(("FUT", "PRE", "PREGAME", "WARMUP"), 1),  # scheduled
+    **dict.fromkeys(("LIVE", "CRIT", "INPROGRESS"), 2),  # live
+    **dict.fromkeys(("FINAL", "OFF", "POSTPONED", "TBD"), 3),  # final/other
+}
+
+
 def map_game_state(state: str) -> int:
-    state_up = (state or "").upper()
-    if state_up in {"FUT", "PRE", "PREGAME", "WARMUP"}:
-        return 1  # scheduled
-    if state_up in {"LIVE", "CRIT", "INPROGRESS"}:
-        return 2  # live
-    if state_up in {"FINAL", "OFF", "POSTPONED", "TBD"}:
-        return 3  # final/other
-    return 1
+    return _STATE_MAP.get((state or "").upper(), 1)
 
 
 def build_team(team_raw: Dict) -> Dict:
@@ -80,9 +93,9 @@ def build_team(team_raw: Dict) -> Dict:
 def fetch_linescore(game_id: int, warnings: List[str]) -> Tuple[int, str]:
     url = BOX_URL.format(game_id=game_id)
     try:
-        r = requests.get(url, timeout=10)
+        r = SESSION.get(url, timeout=10)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
         period = data.get("periodDescriptor", {}).get("number")
         clock_data = data.get("clock", {}) or {}
         clock = clock_data.get("timeRemaining") or clock_data.get("displayValue")
@@ -95,9 +108,9 @@ def fetch_linescore(game_id: int, warnings: List[str]) -> Tuple[int, str]:
 def fetch_games_for_date(date_str: str, warnings: List[str]) -> List[Dict]:
     url = SCHEDULE_URL.format(date=date_str)
     try:
-        r = requests.get(url, timeout=10)
+        r = SESSION.get(url, timeout=10)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
     except Exception as exc:  # noqa: BLE001
         warnings.append(f"Erro ao obter jogos da NHL ({date_str}): {exc}")
         return []
@@ -107,6 +120,22 @@ def fetch_games_for_date(date_str: str, warnings: List[str]) -> List[Dict]:
     for w in weeks:
         games_raw.extend(w.get("games", []) or [])
 
+    # periodo/relogio vem no proprio calendario; boxscore so para jogos
+    # ao vivo em que o calendario nao os traz (em paralelo, I/O)
+    ids = [
+        g.get("id")
+        for g in games_raw
+        if g.get("id")
+        and map_game_state(g.get("gameState")) == 2
+        and (g.get("periodDescriptor") or {}).get("number") is None
+    ]
+    linescores = {}
+    if ids:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(ids))) as ex:
+            linescores = dict(
+                zip(ids, ex.map(lambda gid: fetch_linescore(gid, warnings), ids))
+            )
+
     games_list = []
     for g in games_raw:
         game_id = g.get("id")
@@ -117,10 +146,11 @@ def fetch_games_for_date(date_str: str, warnings: List[str]) -> List[Dict]:
         home_raw = g.get("homeTeam", {}) or {}
         away_raw = g.get("awayTeam", {}) or {}
 
-        period = None
-        clock = None
-        if game_id:
-            period, clock = fetch_linescore(game_id, warnings)
+        period = (g.get("periodDescriptor") or {}).get("number")
+        clock_data = g.get("clock") or {}
+        clock = clock_data.get("timeRemaining") or clock_data.get("displayValue")
+        if game_id in linescores:
+            period, clock = linescores[game_id]
 
         games_list.append(
             {
@@ -148,8 +178,11 @@ def fetch_games():
     today_str = today.isoformat()
     tomorrow_str = tomorrow.isoformat()
 
-    today_games = fetch_games_for_date(today_str, warnings)
-    tomorrow_games = fetch_games_for_date(tomorrow_str, warnings)
+    # hoje e amanha em simultaneo
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        today_games, tomorrow_games = ex.map(
+            lambda d: fetch_games_for_date(d, warnings), (today_str, tomorrow_str)
+        )
 
     live = [g for g in today_games if g.get("status") == 2]
     today_upcoming = [g for g in today_games if g.get("status") == 1]
@@ -9,195 +9,354 @@ usando os endpoints novos:
 Percorre a epoca 2025-2026 ate hoje.
 """
 
+import csv
 import os
+import random
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
 
-import pandas as pd
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+
+from standings import standings_from_csv
 
 SEASON_ID = "20252026"
 SEASON_TYPE = "Regular"
 START_DATE = date(2025, 10, 1)
 OUTPUT_FILE = os.path.join("data", f"nhl_periods_{SEASON_ID}.csv")
+STANDINGS_FILE = os.path.join("data", "standings_cache.json")
 
 SCHEDULE_URL = "https://api-web.nhle.com/v1/schedule/{date}"
 BOX_URL = "https://api-web.nhle.com/v1/gamecenter/{game_id}/boxscore"
 MAX_WARNINGS = 20
+# dict vazio partilhado para defaults de .get(); nunca e alterado
+_EMPTY: Dict = {}
+# boxscores de jogos terminados nao mudam: guardados em disco por game_id
+CACHE_DIR = os.path.join("data", "feed_cache")
+FINAL_STATES = {"OFF", "FINAL"}
+# boxscores em paralelo; a API devolve 429 se abusarmos
+MAX_WORKERS = 8
+
+# sessao partilhada (keep-alive) para api-web.nhle.com: um unico host,
+# pool com uma ligacao por thread
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS, max_retries=0),
+)
+SESSION.headers.update({"Accept": "application/json", "User-Agent": "nhl-dashboard/1.0"})
 
 
 def safe_int(value, default=0):
+    # caminho rapido: a API ja devolve inteiros na grande maioria dos campos
+    if type(value) is int:
+        return value
     try:
         return int(value) if value is not None else default
     except (TypeError, ValueError):
         return default
 
 
-def is_dns_error(exc: Exception) -> bool:
-    msg = str(exc).lower()
-    return "name or service not known" in msg or "name resolution" in msg or "getaddrinfo failed" in msg
+def get_with_retry(url: str, *, tries: int = 4, base: float = 1.0, cap: float = 30.0):
+    """GET com backoff exponencial + jitter; 4xx (exceto 429) falham logo."""
+    for attempt in range(tries):
+        try:
+            r = SESSION.get(url, timeout=10)
+            r.raise_for_status()
+            return r
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as exc:
+            resp = exc.response if isinstance(exc, requests.HTTPError) else None
+            status = resp.status_code if resp is not None else None
+            if status is not None and 400 <= status < 500 and status != 429:
+                raise
+            if attempt == tries - 1:
+                raise
+            delay = min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+            retry_after = resp.headers.get("Retry-After") if resp is not None else None
+            if retry_after and retry_after.isdigit():
+                delay = min(cap, max(delay, float(retry_after)))
+            time.sleep(delay)
+
+
+def fetch_schedule_week(day: date, warnings: List[str]) -> Dict:
+    url = SCHEDULE_URL.format(date=day.isoformat())
+    try:
+        return orjson.loads(get_with_retry(url).content)
+    except Exception as exc:  # noqa: BLE001
+        warnings.append(f"Erro ao obter calendario {day}: {exc}")
+        return {}
 
 
 def fetch_schedule_range(start: date, end: date, warnings: List[str]) -> List[Dict]:
-    games: List[Dict] = []
-    seen_ids = set()
-    current = start
-    # cada chamada traz 1 semana de jogos a partir da data dada
-    while current <= end:
-        url = SCHEDULE_URL.format(date=current.isoformat())
-        try:
-            r = requests.get(url, timeout=10)
-            r.raise_for_status()
-            data = r.json()
-            for week in data.get("gameWeek", []) or []:
-                for g in week.get("games", []) or []:
-                    gid = g.get("id")
-                    if not gid or gid in seen_ids:
-                        continue
-                    seen_ids.add(gid)
-                    start_time = g.get("startTimeUTC") or ""
-                    game_date = start_time.split("T")[0] if start_time else ""
-                    games.append(
-                        {
-                            "id": gid,
-                            "date": game_date,
-                            "home": g.get("homeTeam", {}) or {},
-                            "away": g.get("awayTeam", {}) or {},
-                        }
-                    )
-        except Exception as exc:  # noqa: BLE001
-            warnings.append(f"Erro ao obter calendario {current}: {exc}")
-            if is_dns_error(exc):
-                warnings.append("DNS falhou para api-web.nhle.com; a parar recolha.")
-                break
-        if len(warnings) >= MAX_WARNINGS:
-            warnings.append("Limite de avisos atingido; a parar recolha.")
-            break
-        current += timedelta(days=7)
-    return games
+    # cada chamada traz 1 semana de jogos a partir da data dada; semanas em paralelo
+    days = [start + timedelta(days=7 * i) for i in range((end - start).days // 7 + 1)]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        payloads = list(ex.map(lambda d: fetch_schedule_week(d, warnings), days))
+
+    # chave = id do jogo: semanas sobrepostas substituem o mesmo registo
+    games_by_id: Dict[int, Dict] = {}
+    for data in payloads:
+        for week in data.get("gameWeek", []) or []:
+            for g in week.get("games", []) or []:
+                gid = g.get("id")
+                if not gid:
+                    continue
+                start_time = g.get("startTimeUTC") or ""
+                games_by_id[gid] = {
+                    "id": gid,
+                    "date": start_time.split("T")[0] if start_time else "",
+                    "state": g.get("gameState"),
+                    "home": g.get("homeTeam") or _EMPTY,
+                    "away": g.get("awayTeam") or _EMPTY,
+                }
+    return list(games_by_id.values())
 
 
 def fetch_boxscore(game_id: int, warnings: List[str]) -> Dict:
+    # so se grava cache de jogos terminados, logo um ficheiro existente e final
+    path = os.path.join(CACHE_DIR, f"{game_id}.json")
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            pass  # cache ilegivel: volta a pedir a API
+
     url = BOX_URL.format(game_id=game_id)
     try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        return r.json()
+        box = orjson.loads(get_with_retry(url).content)
     except Exception as exc:  # noqa: BLE001
         warnings.append(f"Falha boxscore {game_id}: {exc}")
-        if is_dns_error(exc):
-            warnings.append("DNS falhou para api-web.nhle.com; parar restantes boxscores.")
         return {}
 
+    if box.get("gameState") in FINAL_STATES:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(orjson.dumps(box))
+        except OSError as exc:
+            warnings.append(f"Falha ao gravar cache de {game_id}: {exc}")
+    return box
+
+
+def has_inline_box(g: Dict) -> bool:
+    """O calendario ja traz golos por periodo e remates das duas equipas?"""
+    return all(
+        node.get("scoresByPeriod") and "sog" in node
+        for node in (g.get("home") or _EMPTY, g.get("away") or _EMPTY)
+    )
+
 
 def extract_periods(team_node: Dict) -> Dict[str, int]:
-    periods = team_node.get("scoresByPeriod", []) or []
-    goals_by_num = {p.get("periodNumber"): safe_int(p.get("goals")) for p in periods}
-    p1 = goals_by_num.get(1, 0)
-    p2 = goals_by_num.get(2, 0)
-    p3 = goals_by_num.get(3, 0)
-    ot = sum(v for k, v in goals_by_num.items() if k and k > 3)
+    p1 = p2 = p3 = ot = 0
+    for p in team_node.get("scoresByPeriod") or []:
+        n = p.get("periodNumber")
+        goals = safe_int(p.get("goals"))
+        if n == 1:
+            p1 = goals
+        elif n == 2:
+            p2 = goals
+        elif n == 3:
+            p3 = goals
+        elif n and n > 3:
+            ot += goals
     total = safe_int(team_node.get("score"), p1 + p2 + p3 + ot)
     if ot <= 0:
         ot = max(0, total - (p1 + p2 + p3))
     return {"p1": p1, "p2": p2, "p3": p3, "ot": ot, "total": total}
 
 
+# ordem das colunas do CSV (build_team_row devolve tuplos nesta ordem)
+COLUMNS = (
+    "GAME_ID",
+    "GAME_DATE",
+    "MATCHUP",
+    "IS_HOME",
+    "HOME_TRICODE",
+    "AWAY_TRICODE",
+    "TEAM_ID",
+    "TEAM_ABBREVIATION",
+    "TEAM_NAME",
+    "P1",
+    "P2",
+    "P3",
+    "OT",
+    # aliases para compatibilidade
+    "Q1",
+    "Q2",
+    "Q3",
+    "Q4",
+    "PTS",
+    "GOALS",
+    "SHOTS",
+    "POWER_PLAY_GOALS",
+    "POWER_PLAY_OPPORTUNITIES",
+    "PIM",
+    "HITS",
+    "BLOCKED",
+    "TAKEAWAYS",
+    "GIVEAWAYS",
+    "SEASON",
+    "SEASON_TYPE",
+)
+
+
 def build_team_row(
-    side: str, matchup: str, game_id: int, game_date: str, team_node: Dict
-) -> Dict:
+    side: str,
+    matchup: str,
+    home_abbr: str,
+    away_abbr: str,
+    game_id: int,
+    game_date: str,
+    team_node: Dict,
+) -> Tuple:
     periods = extract_periods(team_node)
 
+    cn = team_node.get("commonName")
     name = (
-        team_node.get("commonName", {}) or {}
-    ).get("default") or team_node.get("name") or team_node.get("abbrev")
+        (cn.get("default") if isinstance(cn, dict) else None)
+        or team_node.get("name")
+        or team_node.get("abbrev")
+    )
     abbrev = team_node.get("abbrev")
 
-    pp = team_node.get("powerPlayConversion", {}) or {}
-
-    return {
-        "GAME_ID": str(game_id),
-        "GAME_DATE": game_date,
-        "MATCHUP": matchup,
-        "TEAM_ID": team_node.get("id"),
-        "TEAM_ABBREVIATION": abbrev,
-        "TEAM_NAME": name,
-        "P1": periods["p1"],
-        "P2": periods["p2"],
-        "P3": periods["p3"],
-        "OT": periods["ot"],
-        # aliases para compatibilidade
-        "Q1": periods["p1"],
-        "Q2": periods["p2"],
-        "Q3": periods["p3"],
-        "Q4": periods["ot"],
-        "PTS": periods["total"],
-        "GOALS": periods["total"],
-        "SHOTS": safe_int(team_node.get("sog")),
-        "POWER_PLAY_GOALS": safe_int(pp.get("goals")),
-        "POWER_PLAY_OPPORTUNITIES": safe_int(pp.get("opportunities")),
-        "PIM": safe_int(team_node.get("pim")),
-        "HITS": safe_int(team_node.get("hits")),
-        "BLOCKED": safe_int(team_node.get("blockedShots")),
-        "TAKEAWAYS": safe_int(team_node.get("takeaways")),
-        "GIVEAWAYS": safe_int(team_node.get("giveaways")),
-        "SEASON": SEASON_ID,
-        "SEASON_TYPE": SEASON_TYPE,
-    }
-
-
-def build_rows() -> pd.DataFrame:
+    pp = team_node.get("powerPlayConversion") or _EMPTY
+
+    return (
+        str(game_id),
+        game_date,
+        matchup,
+        1 if side == "home" else 0,
+        home_abbr,
+        away_abbr,
+        team_node.get("id"),
+        abbrev,
+        name,
+        periods["p1"],
+        periods["p2"],
+        periods["p3"],
+        periods["ot"],
+        periods["p1"],
+        periods["p2"],
+        periods["p3"],
+        periods["ot"],
+        periods["total"],
+        periods["total"],
+        safe_int(team_node.get("sog")),
+        safe_int(pp.get("goals")),
+        safe_int(pp.get("opportunities")),
+        safe_int(team_node.get("pim")),
+        safe_int(team_node.get("hits")),
+        safe_int(team_node.get("blockedShots")),
+        safe_int(team_node.get("takeaways")),
+        safe_int(team_node.get("giveaways")),
+        SEASON_ID,
+        SEASON_TYPE,
+    )
+
+
+def build_rows() -> List[Tuple]:
+    # DNS verificado uma vez; falhas seguintes sao transitorias (retry)
+    host = urlparse(SCHEDULE_URL).hostname or "api-web.nhle.com"
+    try:
+        socket.getaddrinfo(host, 443)
+    except socket.gaierror as exc:
+        print(f"? DNS falhou para {host}: {exc}")
+        return []
+
     warnings: List[str] = []
     today = date.today()
     schedule = fetch_schedule_range(START_DATE, today, warnings)
 
-    all_rows: List[Dict] = []
-
-    for g in schedule:
-        game_id = g.get("id")
-        if not game_id:
-            continue
-
-        box = fetch_boxscore(game_id, warnings)
+    all_rows: List[Tuple] = []
+
+    # so jogos terminados: futuros/adiados dariam linhas 0-0 e pedidos inuteis
+    jobs = [g for g in schedule if g.get("id") and g.get("state") in FINAL_STATES]
+    # boxscore so quando o calendario nao traz os dados do jogo
+    to_fetch = [g for g in jobs if not has_inline_box(g)]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        fetched = dict(
+            zip(
+                (g["id"] for g in to_fetch),
+                ex.map(lambda g: fetch_boxscore(g["id"], warnings), to_fetch),
+            )
+        )
+    boxes = [
+        fetched[g["id"]]
+        if g["id"] in fetched
+        else {"homeTeam": g["home"], "awayTeam": g["away"]}
+        for g in jobs
+    ]
+
+    for g, box in zip(jobs, boxes):
+        game_id = g["id"]
         if not box:
             continue
 
-        home_node = box.get("homeTeam", {}) or {}
-        away_node = box.get("awayTeam", {}) or {}
+        home_node = box.get("homeTeam") or _EMPTY
+        away_node = box.get("awayTeam") or _EMPTY
 
-        home_abbr = home_node.get("abbrev") or g.get("home", {}).get("abbrev")
-        away_abbr = away_node.get("abbrev") or g.get("away", {}).get("abbrev")
+        home_abbr = home_node.get("abbrev") or g["home"].get("abbrev")
+        away_abbr = away_node.get("abbrev") or g["away"].get("abbrev")
         matchup = f"{away_abbr} @ {home_abbr}"
 
         game_date = g.get("date")
 
-        away_row = build_team_row("away", matchup, game_id, game_date, away_node)
-        home_row = build_team_row("home", matchup, game_id, game_date, home_node)
+        away_row = build_team_row(
+            "away", matchup, home_abbr, away_abbr, game_id, game_date, away_node
+        )
+        home_row = build_team_row(
+            "home", matchup, home_abbr, away_abbr, game_id, game_date, home_node
+        )
 
         all_rows.extend([away_row, home_row])
 
-    df = pd.DataFrame(all_rows)
-    if not df.empty:
-        df.sort_values(["GAME_DATE", "GAME_ID", "TEAM_ABBREVIATION"], inplace=True)
+    i_date = COLUMNS.index("GAME_DATE")
+    i_gid = COLUMNS.index("GAME_ID")
+    i_abbr = COLUMNS.index("TEAM_ABBREVIATION")
+    all_rows.sort(key=lambda r: (r[i_date] or "", r[i_gid], r[i_abbr] or ""))
     if warnings:
-        print("Avisos:", "; ".join(warnings))
-    return df
+        # avisos repetidos (ex.: a mesma falha em varios pedidos) so uma vez
+        unique = list(dict.fromkeys(warnings))
+        print("Avisos:", "; ".join(unique[:MAX_WARNINGS]))
+        if len(unique) > MAX_WARNINGS:
+            print(f"... e mais {len(unique) - MAX_WARNINGS} avisos")
+    return all_rows
 
 
 def main():
     try:
-        df = build_rows()
+        rows = build_rows()
     except Exception as exc:  # noqa: BLE001
         print("? Erro geral:", exc)
         return
 
-    if df.empty:
+    if not rows:
         print("?? Sem dados para gravar.")
         return
 
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    df.to_csv(OUTPUT_FILE, index=False, encoding="utf-8")
-    print(f"? Ficheiro atualizado: {OUTPUT_FILE} ({len(df)} linhas)")
+    with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    print(f"? Ficheiro atualizado: {OUTPUT_FILE} ({len(rows)} linhas)")
+
+    write_standings()
+
+
+def write_standings():
+    """Pre-calcula as standings do CSV para o /api/standings servir tal e qual."""
+    rows, warnings = standings_from_csv(OUTPUT_FILE)
+    body = {"ok": bool(rows), "rows": rows, "warnings": warnings}
+    with open(STANDINGS_FILE, "wb") as f:
+        f.write(orjson.dumps(body))
+    print(f"? Standings atualizadas: {STANDINGS_FILE} ({len(rows)} equipas)")
 
 
 if __name__ == "__main__":
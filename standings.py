@@ -0,0 +1,214 @@
+"""
+standings.py
+
+Calculo das standings a partir do CSV de periodos (gerado pelo getQuarters.py).
+Sem Flask nem pandas: usado pelo app.py (fallback em runtime) e pelo
+getQuarters.py (pre-calculo para data/standings_cache.json).
+"""
+
+import collections
+import csv
+
+# Conferência por equipa (tricode)
+CONF_BY_TRICODE = {
+    "BOS": "East", "BUF": "East", "DET": "East", "FLA": "East", "MTL": "East",
+    "OTT": "East", "TBL": "East", "TOR": "East", "CAR": "East", "CBJ": "East",
+    "NJD": "East", "NYI": "East", "NYR": "East", "PHI": "East", "PIT": "East",
+    "WSH": "East", "ARI": "West", "CGY": "West", "CHI": "West", "COL": "West",
+    "DAL": "West", "EDM": "West", "LAK": "West", "MIN": "West", "NSH": "West",
+    "SJS": "West", "SEA": "West", "STL": "West", "VAN": "West", "VGK": "West",
+    "WPG": "West", "ANA": "West",
+}
+_EAST = frozenset(k for k, v in CONF_BY_TRICODE.items() if v == "East")
+_WEST = frozenset(k for k, v in CONF_BY_TRICODE.items() if v == "West")
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+
+def safe_int(value, default=None):
+    try:
+        if value is None:
+            return default
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+class TeamStats:
+    """Acumulador de resultados de uma equipa (slots: sem dict por instância)."""
+
+    __slots__ = (
+        "team_id", "tricode", "team", "conf",
+        "wins", "losses", "home_w", "home_l", "away_w", "away_l",
+        "results", "home_results", "away_results",
+    )
+
+    def __init__(self, team_id, tricode, team, conf):
+        self.team_id = team_id
+        self.tricode = tricode
+        self.team = team
+        self.conf = conf
+        self.wins = 0
+        self.losses = 0
+        self.home_w = 0
+        self.home_l = 0
+        self.away_w = 0
+        self.away_l = 0
+        self.results = []
+        self.home_results = []
+        self.away_results = []
+
+
+def compute_streak(results):
+    """Recebe lista de 'W'/'L' e devolve '+N' ou '-N'."""
+    if not results:
+        return ""
+    last = results[-1]
+    # tamanho do sufixo igual ao último resultado, via métodos de string em C
+    joined = "".join(results)
+    count = len(joined) - len(joined.rstrip(last))
+    sign = "+" if last == "W" else "-"
+    return f"{sign}{count}"
+
+
+# -----------------------------------------------------------------------------
+# Standings
+# -----------------------------------------------------------------------------
+
+def standings_from_csv(csv_path):
+    """Calcula standings a partir de um CSV de periodos; devolve (rows, warnings)."""
+    warnings = []
+    rows_final = []
+
+    try:
+        games = collections.defaultdict(list)
+        with open(csv_path, encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            idx = {name: i for i, name in enumerate(header)}
+            i_gid = idx["GAME_ID"]
+            i_matchup = idx["MATCHUP"]
+            i_tri = idx["TEAM_ABBREVIATION"]
+            i_tid = idx["TEAM_ID"]
+            i_name = idx["TEAM_NAME"]
+            i_goals = idx["GOALS"]
+            # IS_HOME só existe nos CSVs gerados pelo getQuarters.py mais recente
+            i_is_home = idx.get("IS_HOME")
+            width = len(header)
+            for row in reader:
+                # linhas incompletas: completa com None (como o DictReader)
+                if len(row) < width:
+                    row.extend([None] * (width - len(row)))
+                gid = row[i_gid]
+                if not gid:
+                    continue
+                games[gid].append(row)
+
+        team_stats = {}
+        ts_get = team_stats.get
+
+        for gid, team_rows in games.items():
+            if len(team_rows) != 2:
+                continue
+
+            a, b = team_rows
+            if i_is_home is not None and a[i_is_home] and b[i_is_home]:
+                home_row, away_row = (a, b) if a[i_is_home] == "1" else (b, a)
+            else:
+                matchup = a[i_matchup] or b[i_matchup] or ""
+                parts = matchup.split()
+                if "@" in parts:
+                    home_code = parts[-1]
+                elif len(parts) >= 3:
+                    home_code = parts[0]
+                else:
+                    home_code = a[i_tri]
+
+                # só há 2 linhas: comparação direta em vez de dict
+                home_row, away_row = (b, a) if b[i_tri] == home_code else (a, b)
+
+            try:
+                home_pts = int(home_row[i_goals] or 0)
+                away_pts = int(away_row[i_goals] or 0)
+            except ValueError:
+                continue
+
+            if home_pts > away_pts:
+                home_result, away_result = "W", "L"
+            elif home_pts < away_pts:
+                home_result, away_result = "L", "W"
+            else:
+                continue
+
+            for row, is_home, result in [
+                (home_row, True, home_result),
+                (away_row, False, away_result),
+            ]:
+                tid = row[i_tid]
+                tri = row[i_tri]
+                name = row[i_name]
+                if not tid or not tri:
+                    continue
+
+                s = ts_get(tid)
+                if s is None:
+                    conf = "East" if tri in _EAST else ("West" if tri in _WEST else "")
+                    team_stats[tid] = s = TeamStats(safe_int(tid), tri, name, conf)
+
+                if result == "W":
+                    s.wins += 1
+                    if is_home:
+                        s.home_w += 1
+                    else:
+                        s.away_w += 1
+                else:
+                    s.losses += 1
+                    if is_home:
+                        s.home_l += 1
+                    else:
+                        s.away_l += 1
+
+                s.results.append(result)
+                if is_home:
+                    s.home_results.append(result)
+                else:
+                    s.away_results.append(result)
+
+        for team_id, s in team_stats.items():
+            wins = s.wins
+            losses = s.losses
+            games_played = wins + losses
+            win_pct = wins / games_played if games_played else 0.0
+
+            row = {
+                "team_id": s.team_id,
+                "tricode": s.tricode,
+                "team": s.team,
+                "city": "",
+                "name": s.team,
+                "conf": s.conf,
+                "wins": wins,
+                "losses": losses,
+                "win_pct": win_pct,
+                "home_w": s.home_w,
+                "home_l": s.home_l,
+                "road_w": s.away_w,
+                "road_l": s.away_l,
+                "streak": compute_streak(s.results),
+                "streak_home": compute_streak(s.home_results),
+                "streak_away": compute_streak(s.away_results),
+                "league_rank": None,
+                "playoff_rank": None,
+            }
+            rows_final.append(row)
+
+        rows_final.sort(
+            key=lambda r: (-r["win_pct"], -r["wins"], (r["team"] or ""))
+        )
+
+    except Exception as exc:  # noqa: BLE001
+        warnings.append(f"Erro ao processar CSV de standings: {exc}")
+        return [], warnings
+
+    return rows_final, warnings